@@ -14,6 +14,10 @@ except ImportError:
     import utils as script_utils  # type: ignore
 
 
+# Collapses the whitespace and optional <br/> between a video and its caption
+_FIGURE_CAPTION_PATTERN: re.Pattern[str] = re.compile(r"</video>\s*(<br/?>)?\s*Figure:")
+
+
 def _video_patterns(input_file: Path) -> tuple[str, str]:
     """Returns the original and replacement patterns for video files."""
     # Function to create unique named capture groups for different link patterns
@@ -99,12 +103,13 @@ def convert_asset(
 
     # The file to search for in markdown files
     pattern_file = relative_path.relative_to("quartz")
-    output_file: Path = pattern_file.with_suffix(".avif")
+    output_file: Path = input_file.with_suffix(".avif")
 
     if input_file.suffix in compress.ALLOWED_IMAGE_EXTENSIONS:
         compress.image(input_file)
         original_pattern = rf"(?:\./)?{re.escape(str(pattern_file))}"
-        replacement_pattern = str(output_file)
+        # Markdown links are relative to quartz/, unlike the converted file
+        replacement_pattern = str(pattern_file.with_suffix(".avif"))
 
     elif input_file.suffix in compress.ALLOWED_VIDEO_EXTENSIONS:
         output_file = input_file.with_suffix(".mp4")
@@ -115,20 +120,29 @@ def convert_asset(
     else:
         raise ValueError(f"Error: Unsupported file type '{input_file.suffix}'.")
 
+    compiled_pattern: re.Pattern[str] = re.compile(original_pattern)
     for md_file in script_utils.get_files(
         dir_to_search=md_replacement_dir, filetypes_to_match=(".md",)
     ):
         with open(md_file, "r", encoding="utf-8") as file:
-            content = file.read()
-        content = re.sub(original_pattern, replacement_pattern, content)
+            original_content = file.read()
+
+        # Every pattern contains the asset's file name; skip files where
+        # neither pass could match
+        if (
+            input_file.name not in original_content
+            and "</video>" not in original_content
+        ):
+            continue
+
+        content = compiled_pattern.sub(replacement_pattern, original_content)
 
         # Add a second pass to handle the </video><br/>Figure: pattern
-        content = re.sub(
-            r"</video>\s*(<br/?>)?\s*Figure:", "</video>\n\nFigure:", content
-        )
+        content = _FIGURE_CAPTION_PATTERN.sub("</video>\n\nFigure:", content)
 
-        with open(md_file, "w", encoding="utf-8") as file:
-            file.write(content)
+        if content != original_content:
+            with open(md_file, "w", encoding="utf-8") as file:
+                file.write(content)
 
     if strip_metadata:
         subprocess.run(
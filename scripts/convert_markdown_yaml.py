@@ -23,6 +23,10 @@ except ImportError:
     import utils as script_utils  # type: ignore
 
 
+_FRONT_MATTER_PATTERN: re.Pattern[str] = re.compile(
+    r"^---\n(.*?)\n---\n(.*)", re.DOTALL
+)
+
 _CAN_CONVERT_EXTENSIONS: set[str] = {
     ".avif",
     ".webp",
@@ -42,7 +46,7 @@ def process_card_image_in_markdown(md_file: Path) -> None:
         content = file.read()
 
     # Extract YAML front matter
-    match = re.match(r"^---\n(.*?)\n---\n(.*)", content, re.DOTALL)
+    match = _FRONT_MATTER_PATTERN.match(content)
     if not match:
         return
 
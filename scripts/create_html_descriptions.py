@@ -6,96 +6,302 @@ It reads the content of each Markdown file, extracts the YAML front matter, and
 The generated description is then saved back to the file.
 """
 
+import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
 import os
 import re
+import sqlite3
+import time
 from pathlib import Path
+from typing import Awaitable, Callable
 import yaml
 import google.generativeai as genai  # type: ignore[import]
 
+# libyaml's C loader is much faster, but PyYAML can be built without it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 import scripts.utils as script_utils
 
 # Configure the Gemini API (you'll need to set up your API key)
 genai.configure(api_key="YOUR_API_KEY_HERE")
 
+_MODEL_NAME = "gemini-1.5-pro"
+_MAX_DESCRIPTION_LENGTH = 160
+# Cap the output near the length limit so the first response is usable
+_GENERATION_CONFIG = {"max_output_tokens": 45, "temperature": 0.3}
 
-def get_gemini_description(content: str) -> str:
-    """
-    Generate a description for a blog post using the Gemini 1.5 Pro model.
-    """
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    prompt = f"""
+# Everything in the prompt except the post content is static, so build it once
+_PROMPT_PREFIX = """
     Based on the following content, write a concise description for a blog post. 
     The description should be engaging, accurate, and between 150-160 characters long.
     
     Content:
-    {content[:1000]}  # Limiting to first 1000 characters for brevity
     """
-    response = model.generate_content(prompt)
-    return response.text
+
+_FRONT_MATTER_PATTERN = re.compile(r"^---\n(.*?)\n---", re.DOTALL)
+
+_FRONT_MATTER_PEEK_CHARS = 8192
+
+_MAX_CONCURRENT_REQUESTS = 8
+# Stay under Gemini's published rate limits instead of waiting out 429s
+_REQUESTS_PER_MINUTE = 60
+_TOKENS_PER_MINUTE = 4_000_000
+
+# Descriptions are cached on disk so re-runs over the same posts skip the API
+_CACHE_PATH = Path(__file__).parent / ".gemini_cache.sqlite"
+
+
+class _TokenBucket:
+    """
+    Async token bucket holding up to `capacity` tokens, refilled continuously
+    at `capacity` tokens per `period` seconds. Tests can pass a fake `clock`
+    and `sleep` instead of patching time and asyncio.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.capacity = capacity
+        self._rate = capacity / period
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Waits until `amount` tokens are available, then consumes them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await self._sleep((amount - self._tokens) / self._rate)
+
+
+_request_limiter = _TokenBucket(_REQUESTS_PER_MINUTE)
+_token_limiter = _TokenBucket(_TOKENS_PER_MINUTE)
+
+
+@functools.cache
+def _get_model() -> genai.GenerativeModel:
+    """Returns the Gemini model, constructing it only once per process."""
+    return genai.GenerativeModel(_MODEL_NAME)
+
+
+def _cache_key(prompt: str) -> str:
+    """
+    Hashes the model settings and full prompt, so that changing either
+    invalidates cached descriptions.
+    """
+    settings = _MODEL_NAME + repr(sorted(_GENERATION_CONFIG.items()))
+    return hashlib.sha256((settings + prompt).encode()).hexdigest()
+
+
+def _truncate_description(description: str) -> str:
+    """Cuts an overlong description back to the last whole word that fits."""
+    description = description.strip()
+    if len(description) <= _MAX_DESCRIPTION_LENGTH:
+        return description
+    return description[:_MAX_DESCRIPTION_LENGTH].rsplit(" ", 1)[0]
+
+
+def _connect_cache() -> sqlite3.Connection:
+    connection = sqlite3.connect(_CACHE_PATH)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS descriptions "
+        "(key TEXT PRIMARY KEY, description TEXT, ts INTEGER)"
+    )
+    return connection
+
+
+def _read_cache(key: str) -> str | None:
+    with contextlib.closing(_connect_cache()) as connection:
+        row = connection.execute(
+            "SELECT description FROM descriptions WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _write_cache(key: str, description: str) -> None:
+    with contextlib.closing(_connect_cache()) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?)",
+            (key, description, int(time.time())),
+        )
+
+
+async def get_gemini_description(content: str, use_cache: bool = True) -> str:
+    """
+    Generate a description for a blog post using the Gemini 1.5 Pro model.
+
+    Args:
+        content: The content of the post.
+        use_cache: Whether to return a previously generated description for
+            the same prompt. A freshly generated description always replaces
+            the cached one.
+    """
+    # Limiting to first 1000 characters for brevity
+    prompt = _PROMPT_PREFIX + content[:1000]
+    key = _cache_key(prompt)
+    if use_cache:
+        cached_description = _read_cache(key)
+        if cached_description is not None:
+            return cached_description
+
+    await _request_limiter.acquire()
+    await _token_limiter.acquire(len(prompt) // 4)  # Roughly 4 chars per token
+    response = await _get_model().generate_content_async(
+        prompt, generation_config=_GENERATION_CONFIG
+    )
+    description = _truncate_description(response.text)
+    _write_cache(key, description)
+    return description
 
 
-def process_file(file_path: Path) -> None:
+def _read_front_matter(file_path: Path) -> tuple[str, dict] | None:
     """
-    Process a single file, extract YAML front matter, generate a description if needed, and update the file.
+    Returns the content and parsed YAML front matter of a file which still
+    needs a description, or None if the file should be skipped.
     """
     with open(file_path, "r", encoding="utf-8") as file:
-        content = file.read()
+        # Most posts already have a description, so only read the whole
+        # file once we know it's needed for the prompt
+        content = file.read(_FRONT_MATTER_PEEK_CHARS)
 
-    # Extract YAML front matter
-    yaml_match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
-    if yaml_match:
-        yaml_content = yaml_match.group(1)
-        data = yaml.safe_load(yaml_content)
+        # Extract YAML front matter
+        yaml_match = _FRONT_MATTER_PATTERN.match(content)
+        if not yaml_match and len(content) == _FRONT_MATTER_PEEK_CHARS:
+            # The front matter may extend past the peeked chunk
+            content += file.read()
+            yaml_match = _FRONT_MATTER_PATTERN.match(content)
+        if not yaml_match:
+            print(f"No YAML front matter found in {file_path}. Skipping.")
+            return None
 
-        if "description" not in data or not data["description"]:
-            print(f"No description found in {file_path}. Generating one...")
+        data = yaml.load(yaml_match.group(1), Loader=SafeLoader)
+        if "description" in data and data["description"]:
+            print(f"Description already exists in {file_path}. Skipping.")
+            return None
+
+        content += file.read()
+    return content, data
+
+
+async def _generate_description(
+    content: str, semaphore: asyncio.Semaphore, use_cache: bool
+) -> str:
+    async with semaphore:
+        return await get_gemini_description(content, use_cache=use_cache)
 
-            while True:
-                generated_description = get_gemini_description(content)
-                print(f"Generated description: {generated_description}")
-
-                user_input = input(
-                    "Accept this description? (yes/no): "
-                ).lower()
-                if user_input == "yes":
-                    data["description"] = generated_description
-                    break
-                elif user_input == "no":
-                    print("Generating a new description...")
-                else:
-                    print("Invalid input. Please enter 'yes' or 'no'.")
-
-            # Update the file with the new YAML front matter
-            updated_yaml = yaml.dump(data, allow_unicode=True)
-            updated_content = re.sub(
-                r"^---\n.*?\n---",
-                f"---\n{updated_yaml}---",
-                content,
-                flags=re.DOTALL,
-            )
 
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write(updated_content)
+async def process_file(
+    file_path: Path, content: str, data: dict, generated_description: str
+) -> None:
+    """
+    Ask the user to review the generated description for a file, regenerating
+    it until accepted, and then update the file's YAML front matter.
+    """
+    while True:
+        print(f"Generated description for {file_path}: {generated_description}")
 
-            print(f"Updated {file_path} with new description.")
+        user_input = input("Accept this description? (yes/no): ").lower()
+        if user_input == "yes":
+            data["description"] = generated_description
+            break
+        elif user_input == "no":
+            print("Generating a new description...")
+            # Don't serve the rejected description again
+            generated_description = await get_gemini_description(
+                content, use_cache=False
+            )
         else:
-            print(f"Description already exists in {file_path}. Skipping.")
-    else:
-        print(f"No YAML front matter found in {file_path}. Skipping.")
+            print("Invalid input. Please enter 'yes' or 'no'.")
+
+    # Update the file with the new YAML front matter
+    updated_yaml = yaml.dump(data, allow_unicode=True)
+    updated_content = _FRONT_MATTER_PATTERN.sub(
+        lambda _: f"---\n{updated_yaml}---", content, count=1
+    )
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(updated_content)
+
+    print(f"Updated {file_path} with new description.")
+
+
+async def process_files(file_paths: list[Path], use_cache: bool = True) -> None:
+    """
+    Generate descriptions for all files lacking one, with up to
+    _MAX_CONCURRENT_REQUESTS Gemini requests in flight at once. The user then
+    reviews each description in turn; files whose generation failed are
+    reported and skipped.
+    """
+    to_describe: list[tuple[Path, str, dict]] = []
+    for file_path in file_paths:
+        front_matter = _read_front_matter(file_path)
+        if front_matter is not None:
+            print(f"No description found in {file_path}. Generating one...")
+            to_describe.append((file_path, *front_matter))
+
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+    # One failed request shouldn't throw away the rest of the batch
+    descriptions = await asyncio.gather(
+        *(
+            _generate_description(content, semaphore, use_cache)
+            for _, content, _ in to_describe
+        ),
+        return_exceptions=True,
+    )
+
+    for (file_path, content, data), description in zip(to_describe, descriptions):
+        if isinstance(description, Exception):
+            print(f"Failed to generate a description for {file_path}: {description}")
+            continue
+        await process_file(file_path, content, data, description)
 
 
 def main() -> None:
     """
     Main function to process all Markdown files in the current directory.
     """
+    parser = argparse.ArgumentParser(
+        description="Generate descriptions for posts which lack them."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always query Gemini instead of reusing cached descriptions",
+    )
+    args = parser.parse_args()
+
     git_root = script_utils.get_git_root()
     if git_root is None:
         raise RuntimeError("Could not find git root")
     directory = git_root / "content"
-    for filename in os.listdir(directory):
-        if filename.endswith(".md"):
-            file_path = os.path.join(directory, filename)
-            process_file(Path(file_path))
+    with os.scandir(directory) as entries:
+        file_paths = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".md") and entry.is_file(follow_symlinks=False)
+        ]
+    asyncio.run(process_files(file_paths, use_cache=not args.no_cache))
 
 
 if __name__ == "__main__":
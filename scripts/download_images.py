@@ -4,7 +4,7 @@ import re
 from . import utils as script_utils
 from . import compress
 import subprocess
-from typing import Sequence
+from typing import Iterable, Sequence
 from pathlib import Path
 
 
@@ -38,17 +38,41 @@ def download_image(url: str, target_dir: Path) -> bool:
         return False
 
 
-def replace_urls_in_file(file_path: Path, url: str, new_url: str) -> None:
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    new_content = content.replace(url, new_url)
+def replace_urls_in_file(
+    file_path: Path,
+    content: str,
+    url_pattern: re.Pattern[str],
+    url_replacements: dict[str, str],
+) -> None:
+    """
+    Replaces every URL matched by url_pattern in a single pass, given the
+    already-read content of file_path.
+    """
+    new_content = url_pattern.sub(lambda match: url_replacements[match[0]], content)
 
     with open(file_path, "w") as f:
         f.write(new_content)
 
 
-SUFFIX_REGEX = r"\.(jpg|jpeg|png|gif|mov|mp4|webm|avi|mpeg|webp|avif)"
+SUFFIX_REGEX = r"\.(jpg|jpeg|png|gif|mov|mp4|webm|avif|avi|mpeg|webp)"
+# URLs can't contain whitespace, quotes, or the parens/brackets which delimit
+# Markdown and HTML links, so the lazy scan stops at the end of each URL
+# instead of backtracking through the rest of the line. The suffix must end
+# the URL, so e.g. img.png.webp or a.avif aren't cut short at .png or .avi
+_URL_END = r"(?=[\s\"'<>()]|$)"
+_ASSET_URL_PATTERN: re.Pattern[str] = re.compile(
+    r"(https?://[^\s\"'<>()]*?" + SUFFIX_REGEX + _URL_END + r")"
+)
+
+
+def _replacement_pattern(urls: Iterable[str]) -> re.Pattern[str]:
+    """
+    Compiles one pattern matching any of the given URLs. Longer URLs are
+    tried first, so that a URL which prefixes another can't shadow it.
+    """
+    return re.compile(
+        "|".join(re.escape(url) for url in sorted(urls, key=len, reverse=True))
+    )
 
 
 def main(markdown_files: list[Path]) -> None:
@@ -62,22 +86,28 @@ def main(markdown_files: list[Path]) -> None:
 
     # 1. Find all image URLs in Markdown files
     asset_urls: set[str] = set()
+    # Keep the contents so the replacement pass doesn't re-read every file
+    contents: dict[Path, str] = {}
     for file in markdown_files:
         with open(file, "r") as f:
             content = f.read()
-            print(r"(https?://.*?" + SUFFIX_REGEX)
-            urls = re.findall(r"(https?://.*?\." + SUFFIX_REGEX + r")", content)
+            contents[file] = content
+            urls = _ASSET_URL_PATTERN.findall(content)
             asset_urls.update(url for url, _ in urls)
 
     # 2. Download each image and replace URLs in markdown files
     target_dir = Path("static/images/posts")
     os.makedirs(images_dir, exist_ok=True)
 
-    for url in asset_urls:
-        if download_image(url, images_dir):
-            new_url = f"/{target_dir}/{os.path.basename(url)}"
-            for file in markdown_files:
-                replace_urls_in_file(file, url, new_url)
+    url_replacements: dict[str, str] = {
+        url: f"/{target_dir}/{os.path.basename(url)}"
+        for url in asset_urls
+        if download_image(url, images_dir)
+    }
+    if url_replacements:
+        url_pattern = _replacement_pattern(url_replacements)
+        for file in markdown_files:
+            replace_urls_in_file(file, contents[file], url_pattern, url_replacements)
 
     print("Image download and replacement complete!")
 
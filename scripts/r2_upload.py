@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import concurrent.futures
 import shutil
 import argparse
 import subprocess
@@ -6,6 +7,7 @@ from pathlib import Path
 import re
 from typing import Optional, Sequence
 import os
+import tempfile
 
 
 # Add this function at the beginning of the file
@@ -21,13 +23,125 @@ except ImportError:
 R2_BASE_URL: str = "https://assets.turntrout.com"
 R2_BUCKET_NAME: str = "turntrout"
 R2_MEDIA_DIR: Path = Path(get_home_directory()) / "Downloads" / "website-media-r2"
+RCLONE_TRANSFERS: int = 16  # Parallel uploads when batching with rclone
+
+_QUARTZ_PREFIX_PATTERN: re.Pattern[str] = re.compile(r".*quartz/")
+_LEADING_SLASH_PATTERN: re.Pattern[str] = re.compile(r"^/")
 
 
 def get_r2_key(filepath: Path) -> str:
     # Convert Path to string and remove everything up to and including 'quartz/'
-    key = re.sub(r".*quartz/", "", str(filepath))
+    key = _QUARTZ_PREFIX_PATTERN.sub("", str(filepath))
     # Remove leading '/' if present
-    return re.sub(r"^/", "", key)
+    return _LEADING_SLASH_PATTERN.sub("", key)
+
+
+def _check_uploadable(file_path: Path) -> str:
+    """
+    Returns the R2 key for a file, after checking that it can be uploaded.
+
+    Raises:
+        ValueError: If the file path does not contain 'quartz/'.
+        FileNotFoundError: If the file does not exist.
+    """
+    if "quartz/" not in str(file_path):
+        raise ValueError("Error: File path does not contain 'quartz/'.")
+    if not file_path.is_file():
+        raise FileNotFoundError(f"Error: File not found: {file_path}")
+    relative_path = script_utils.path_relative_to_quartz(file_path)
+    return get_r2_key(relative_path)
+
+
+def _rewrite_references(
+    text_file_path: Path,
+    reference_pattern: re.Pattern[str],
+    r2_addresses: dict[str, str],
+    needles: tuple[bytes, ...],
+) -> None:
+    """
+    Replaces each path matched by reference_pattern with its R2 address.
+    Files which contain none of the needles are left untouched.
+    """
+    raw_content: bytes = text_file_path.read_bytes()
+    # Substring search is far cheaper than decoding and running the regex
+    if not any(needle in raw_content for needle in needles):
+        return
+
+    file_content: str = raw_content.decode("utf-8")
+    new_content: str = reference_pattern.sub(
+        lambda match: r2_addresses[match["path"]], file_content
+    )
+    if new_content != file_content:
+        with open(text_file_path, "w", encoding="utf-8") as f:
+            f.write(new_content)
+
+
+def _update_references(
+    r2_keys: dict[Path, str],
+    replacement_dir: Optional[Path],
+    verbose: bool = False,
+) -> None:
+    """
+    Points references to uploaded files at their R2 addresses. Each markdown
+    file is read and rewritten once, however many files were uploaded.
+
+    Args:
+        r2_keys (dict[Path, str]): Maps each uploaded file to its R2 key.
+        replacement_dir (Path): The directory of markdown files to update.
+        verbose (bool): Whether to print verbose output.
+    """
+    if not r2_keys:
+        return
+
+    r2_addresses: dict[str, str] = {}
+    # Every matchable path ends with its 'static/' subpath
+    needles: list[bytes] = []
+    for file_path, r2_key in r2_keys.items():
+        relative_original_path: Path = script_utils.path_relative_to_quartz(file_path)
+        # References start with 'static', generally
+        relative_subpath: Path = Path(
+            *relative_original_path.parts[
+                relative_original_path.parts.index("static") :
+            ]
+        )
+        r2_address: str = f"{R2_BASE_URL}/{r2_key}"
+        if verbose:
+            print(f'Changing "{relative_subpath}" references to "{r2_address}"')
+        r2_addresses[str(relative_original_path)] = r2_address
+        r2_addresses[str(relative_subpath)] = r2_address
+        needles.append(str(relative_subpath).encode("utf-8"))
+
+    # Longest first, so original paths match before their 'static/' subpaths
+    escaped_paths: str = "|".join(
+        re.escape(path) for path in sorted(r2_addresses, key=len, reverse=True)
+    )
+    reference_pattern: re.Pattern[str] = re.compile(
+        rf"(?<=[\(\"])(?:\.?/)?(?P<path>{escaped_paths})"
+    )
+    needles_tuple: tuple[bytes, ...] = tuple(needles)
+    markdown_files = script_utils.get_files(replacement_dir, (".md",))
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        # Consume the iterator so that worker exceptions are raised here
+        list(
+            executor.map(
+                lambda text_file_path: _rewrite_references(
+                    text_file_path, reference_pattern, r2_addresses, needles_tuple
+                ),
+                markdown_files,
+            )
+        )
+
+
+def _move_file(file_path: Path, move_to_dir: Path, verbose: bool = False) -> None:
+    """Moves a file to move_to_dir, preserving its path relative to the git root."""
+    if verbose:
+        print(f"Moving original file: {file_path}")
+    # Create the directory structure in the target location
+    git_root = script_utils.get_git_root()
+    relative_path = file_path.relative_to(str(git_root))
+    target_path = move_to_dir / relative_path
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(file_path), str(target_path))
 
 
 def upload_and_move(
@@ -52,12 +166,7 @@ def upload_and_move(
     if move_to_dir is None:
         move_to_dir = R2_MEDIA_DIR
 
-    if "quartz/" not in str(file_path):
-        raise ValueError("Error: File path does not contain 'quartz/'.")
-    if not file_path.is_file():
-        raise FileNotFoundError(f"Error: File not found: {file_path}")
-    relative_path = script_utils.path_relative_to_quartz(file_path)
-    r2_key: str = get_r2_key(relative_path)
+    r2_key: str = _check_uploadable(file_path)
 
     if verbose:
         print(f"Uploading {file_path} to R2 with key: {r2_key}")
@@ -68,39 +177,76 @@ def upload_and_move(
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Failed to upload file to R2: {e}") from e
 
-    # Update references in markdown files
-    relative_original_path: Path = script_utils.path_relative_to_quartz(file_path)
-    # References start with 'static', generally
-    relative_subpath: Path = Path(
-        *relative_original_path.parts[relative_original_path.parts.index("static") :]
-    )
-    r2_address: str = f"{R2_BASE_URL}/{r2_key}"
-    if verbose:
-        print(f'Changing "{relative_subpath}" references to "{r2_address}"')
-    for text_file_path in script_utils.get_files(replacement_dir, (".md",)):
-        with open(text_file_path, "r", encoding="utf-8") as f:
-            file_content: str = f.read()
-
-        # Check original_path because it's longer than subpath
-        escaped_original_path: str = re.escape(str(relative_original_path))
-        escaped_relative_subpath: str = re.escape(str(relative_subpath))
-        new_content: str = re.sub(
-            rf"(?<=[\(\"])(?:\.?/)?(?:{escaped_original_path}|{escaped_relative_subpath})",
-            r2_address,
-            file_content,
-        )
-        with open(text_file_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+    _update_references({file_path: r2_key}, replacement_dir, verbose=verbose)
 
     if move_to_dir:
+        _move_file(file_path, move_to_dir, verbose=verbose)
+
+
+def upload_and_move_all(
+    file_paths: Sequence[Path],
+    verbose: bool = False,
+    replacement_dir: Optional[Path] = None,
+    move_to_dir: Optional[Path] = None,
+) -> None:
+    """
+    Upload many files to R2 storage and update references. Unlike calling
+    upload_and_move per file, this runs one rclone process per source root,
+    so startup, auth, and connection setup are paid once and transfers run
+    in parallel.
+
+    Args:
+        file_paths (Sequence[Path]): The files to upload.
+        verbose (bool): Whether to print verbose output.
+        move_to_dir (Path): The local directory to move the files to after upload.
+
+    Raises:
+        ValueError: If a file path does not contain 'quartz/'.
+        RuntimeError: If an rclone command fails.
+        FileNotFoundError: If a file does not exist or cannot be moved.
+    """
+    if move_to_dir is None:
+        move_to_dir = R2_MEDIA_DIR
+
+    r2_keys: dict[Path, str] = {
+        file_path: _check_uploadable(file_path) for file_path in file_paths
+    }
+
+    # rclone's --files-from paths are relative to the source directory, and
+    # are uploaded to the same relative path under the bucket
+    keys_by_source_root: dict[Path, list[str]] = {}
+    for file_path, r2_key in r2_keys.items():
         if verbose:
-            print(f"Moving original file: {file_path}")
-        # Create the directory structure in the target location
-        git_root = script_utils.get_git_root()
-        relative_path = file_path.relative_to(str(git_root))
-        target_path = move_to_dir / relative_path
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(file_path), str(target_path))
+            print(f"Uploading {file_path} to R2 with key: {r2_key}")
+        source_root = Path(str(file_path).removesuffix(r2_key))
+        keys_by_source_root.setdefault(source_root, []).append(r2_key)
+
+    for source_root, keys in keys_by_source_root.items():
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as files_from:
+            files_from.write("\n".join(keys) + "\n")
+            files_from.flush()
+            try:
+                subprocess.run(
+                    [
+                        "rclone",
+                        "copy",
+                        "--files-from",
+                        files_from.name,
+                        f"--transfers={RCLONE_TRANSFERS}",
+                        f"--checkers={RCLONE_TRANSFERS}",
+                        str(source_root),
+                        f"r2:{R2_BUCKET_NAME}/",
+                    ],
+                    check=True,
+                )
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"Failed to upload files to R2: {e}") from e
+
+    _update_references(r2_keys, replacement_dir, verbose=verbose)
+
+    if move_to_dir:
+        for file_path in r2_keys:
+            _move_file(file_path, move_to_dir, verbose=verbose)
 
 
 def main() -> None:
@@ -139,24 +285,26 @@ def main() -> None:
     parser.add_argument("file", type=Path, nargs="?", help="File to upload")
     args = parser.parse_args()
 
-    files_to_upload: Sequence[Path] = []
     if args.all_asset_dir:
         files_to_upload = script_utils.get_files(
             args.all_asset_dir,
             args.filetypes,
         )
+        upload_and_move_all(
+            files_to_upload,
+            verbose=args.verbose,
+            replacement_dir=args.replacement_dir,
+            move_to_dir=args.move_to_dir,
+        )
     elif args.file:
-        files_to_upload = [args.file]
-    else:
-        parser.error("Either --all-asset-dir or a file must be specified")
-
-    for file_to_upload in files_to_upload:
         upload_and_move(
-            file_to_upload,
+            args.file,
             verbose=args.verbose,
             replacement_dir=args.replacement_dir,
             move_to_dir=args.move_to_dir,
         )
+    else:
+        parser.error("Either --all-asset-dir or a file must be specified")
 
 
 if __name__ == "__main__":
@@ -3,8 +3,80 @@ import tempfile
 from pathlib import Path
 
 
+def _import_test_utils():
+    """
+    Imports the test utilities on first use rather than at collection, so
+    runs that never build assets (e.g. only test_linkchecker.py) don't load
+    PIL and numpy.
+    """
+    try:
+        from . import utils as test_utils
+    except ImportError:
+        import utils as test_utils  # type: ignore
+    return test_utils
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """
+    Parametrizes any test taking image_ext or video_ext over the
+    corresponding compress extensions, sorted so that xdist workers collect
+    the same order.
+    """
+    if not {"image_ext", "video_ext"} & set(metafunc.fixturenames):
+        return
+
+    try:
+        from .. import compress
+    except ImportError:
+        import compress  # type: ignore
+
+    for argname, extensions in (
+        ("image_ext", compress.ALLOWED_IMAGE_EXTENSIONS),
+        ("video_ext", compress.ALLOWED_VIDEO_EXTENSIONS),
+    ):
+        if argname in metafunc.fixturenames:
+            metafunc.parametrize(argname, sorted(extensions))
+
+
 @pytest.fixture()
 def temp_dir():
     """Creates a temporary directory and cleans up afterwards."""
     with tempfile.TemporaryDirectory() as dir_path:
         yield Path(dir_path)
+
+
+@pytest.fixture(scope="session")
+def test_env_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """
+    Builds the test assets once per session. Creating them shells out to
+    ImageMagick and FFmpeg, so tests copy this tree instead of rebuilding it.
+    """
+    template_dir = tmp_path_factory.mktemp("test_env")
+    _import_test_utils().populate_test_env(template_dir)
+    return template_dir
+
+
+@pytest.fixture(scope="session")
+def stub_test_env_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Builds the test environment with stub assets, without any subprocesses."""
+    template_dir = tmp_path_factory.mktemp("stub_test_env")
+    _import_test_utils().populate_test_env(template_dir, stub_assets=True)
+    return template_dir
+
+
+class _Recorder:
+    """A minimal callable stand-in that records its calls and returns None."""
+
+    __slots__ = ("calls",)
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[tuple, dict]] = []
+
+    def __call__(self, *args, **kwargs) -> None:
+        self.calls.append((args, kwargs))
+
+
+@pytest.fixture()
+def recorder() -> _Recorder:
+    """A fresh call recorder, for use with monkeypatch.setattr."""
+    return _Recorder()
@@ -7,10 +7,10 @@ from .. import utils as script_utils
 
 try:
     from . import utils as test_utils
-    from .utils import setup_test_env
+    from .utils import setup_test_env, stub_test_env
 except ImportError:
     import utils as test_utils  # type: ignore
-    from test_utils import setup_test_env  # type: ignore
+    from test_utils import setup_test_env, stub_test_env  # type: ignore
 
 
 import subprocess
@@ -19,116 +19,112 @@ import shutil
 import yaml
 import io
 
-mock_r2_upload = mock.MagicMock()
-mock.patch.dict("sys.modules", {"r2_upload": mock_r2_upload}).start()
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
 
+# What each image's markdown file should contain after conversion
+_EXPECTED_IMAGE_MARKDOWN: str = (
+    "![](static/asset.avif)\n"
+    "[[static/asset.avif]]\n"
+    '<img src="static/asset.avif" alt="shrek"/>\n'
+)
+
+# Converted video tags; markdown links give no alt, but the source tag had one
+_EXPECTED_VIDEO_TAGS: tuple[str, ...] = (
+    '<video src="static/asset.mp4" type="video/mp4"><source src="static/asset.mp4" type="video/mp4"></video>',
+    '<video src="static/asset.mp4" alt="shrek" type="video/mp4"><source src="static/asset.mp4" type="video/mp4"></video>',
+)
+_EXPECTED_GIF_VIDEO_TAGS: tuple[str, ...] = (
+    '<video autoplay loop muted playsinline src="static/asset.mp4" type="video/mp4"><source src="static/asset.mp4" type="video/mp4"></video>',
+    '<video autoplay loop muted playsinline src="static/asset.mp4" alt="shrek" type="video/mp4"><source src="static/asset.mp4" type="video/mp4"></video>',
+)
 
-@pytest.mark.parametrize("ext", compress.ALLOWED_IMAGE_EXTENSIONS)
-def test_image_conversion(ext: str, setup_test_env):
-    test_dir = Path(setup_test_env)
-    asset_path: Path = test_dir / "quartz/static" / f"asset{ext}"
+
+# image_ext and video_ext are parametrized by pytest_generate_tests in conftest
+def test_image_conversion(image_ext: str, setup_test_env):
+    paths = setup_test_env
+    asset_path: Path = paths.asset(image_ext)
     avif_path: Path = asset_path.with_suffix(".avif")
-    content_path = Path(setup_test_env) / "content" / f"{ext.lstrip('.')}.md"
 
-    convert_assets.convert_asset(asset_path, md_replacement_dir=test_dir / "content")
+    convert_assets.convert_asset(asset_path, md_replacement_dir=paths.content)
 
     assert avif_path.exists()  # Check if AVIF file was created
 
     # Check that name conversion occurred
-    with open(content_path, "r") as f:
-        file_content = f.read()
+    file_content = paths.md(image_ext).read_text()
     assert asset_path.exists()
-
-    target_content: str = "![](static/asset.avif)\n"
-    target_content += "[[static/asset.avif]]\n"
-    target_content += '<img src="static/asset.avif" alt="shrek"/>\n'
-    assert file_content == target_content
+    assert file_content == _EXPECTED_IMAGE_MARKDOWN
 
 
-@pytest.mark.parametrize("ext", compress.ALLOWED_VIDEO_EXTENSIONS)
-def test_video_conversion(ext: str, setup_test_env):
-    asset_path: Path = Path(setup_test_env) / "quartz/static" / f"asset{ext}"
+def test_video_conversion(video_ext: str, setup_test_env):
+    paths = setup_test_env
+    asset_path: Path = paths.asset(video_ext)
     mp4_path: Path = asset_path.with_suffix(".mp4")
-    content_path: Path = Path(setup_test_env) / "content" / f"{ext.lstrip('.')}.md"
-    with open(content_path, "r") as f:
-        file_content: str = f.read()
 
     convert_assets.convert_asset(
-        asset_path, md_replacement_dir=Path(setup_test_env), remove_originals=True
+        asset_path, md_replacement_dir=paths.root, remove_originals=True
     )
 
     assert mp4_path.exists()
-    with open(content_path, "r") as f:
-        file_content = f.read()
-
-    video_tags = "autoplay loop muted playsinline " if ext == ".gif" else ""
-    for alt_tag in ("", 'alt="shrek" '):  # The source-tag had an alt
-        assert (
-            f'<video {video_tags}src="static/asset.mp4" {alt_tag}type="video/mp4"><source src="static/asset.mp4" type="video/mp4"></video>'
-            in file_content
-        )
+    file_content: str = paths.md(video_ext).read_text()
+
+    expected_tags = (
+        _EXPECTED_GIF_VIDEO_TAGS if video_ext == ".gif" else _EXPECTED_VIDEO_TAGS
+    )
+    for tag in expected_tags:
+        assert tag in file_content, f"Missing video tag: {tag}"
 
 
 # Test that it keeps or removes source files
 @pytest.mark.parametrize("remove_originals", [True, False])
 def test_remove_source_files(setup_test_env, remove_originals):
-    asset_path = Path(setup_test_env) / "quartz" / "static" / "asset.jpg"
+    asset_path = setup_test_env.asset(".jpg")
     assert asset_path.exists()
 
     convert_assets.convert_asset(
         asset_path,
         remove_originals=remove_originals,
-        md_replacement_dir=Path(setup_test_env),
+        md_replacement_dir=setup_test_env.root,
     )
     assert asset_path.exists() == (not remove_originals)
 
 
-def test_strip_metadata(setup_test_env):
-    dummy_image: Path = Path(setup_test_env) / "quartz/static/asset_with_exif.jpg"
-    test_utils.create_test_image(dummy_image, "32x32")
-
-    # Simulate adding metadata using exiftool
-    with mock.patch("subprocess.run") as mock_exiftool:
-        mock_exiftool.return_value = subprocess.CompletedProcess(args=[], returncode=0)
-        subprocess.run(
-            [
-                "exiftool",
-                "-Artist=Test Artist",
-                "-Copyright=Test Copyright",
-                str(dummy_image),
-            ],
-            check=True,
+def test_strip_metadata(stub_test_env, monkeypatch, recorder):
+    asset_path: Path = stub_test_env.asset(".jpg")
+    monkeypatch.setattr(compress, "image", recorder)
+
+    with mock.patch("subprocess.run") as mock_run:
+        convert_assets.convert_asset(
+            asset_path,
+            strip_metadata=True,
+            md_replacement_dir=stub_test_env.root,
         )
 
-    # Convert the image to AVIF
-    convert_assets.convert_asset(
-        dummy_image,
-        strip_metadata=True,
-        md_replacement_dir=Path(setup_test_env),
+    # Locating the quartz directory also calls git, so check the last call
+    assert mock_run.call_args.args == (
+        ["exiftool", "-all=", str(asset_path.with_suffix(".avif")), "--verbose"],
     )
-
-    # Read the output of exiftool on the AVIF file and assert that no EXIF data is present
-    with mock.patch("subprocess.check_output") as mock_check_output:
-        mock_check_output.return_value = b""  # No EXIF data should be returned
-        exif_output = subprocess.check_output(
-            ["exiftool", dummy_image.with_suffix(".avif")]
-        )
-        assert "Test Artist" not in exif_output.decode()  # Check for a specific tag
-        assert "Test Copyright" not in exif_output.decode()
+    assert mock_run.call_args.kwargs == {
+        "stdout": subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL,
+        "check": False,
+    }
+    assert recorder.calls == [((asset_path,), {})]
 
 
-def test_ignores_unsupported_file_types(setup_test_env):
-    asset_path = Path(setup_test_env) / "quartz/static/unsupported.txt"
+# The error-path tests raise before touching any file, so they share the
+# session template instead of copying it
+def test_ignores_unsupported_file_types(stub_test_env_template):
+    asset_path = stub_test_env_template / "quartz/static/unsupported.txt"
 
     with pytest.raises(ValueError):
         convert_assets.convert_asset(
-            asset_path, md_replacement_dir=Path(setup_test_env) / "content"
+            asset_path, md_replacement_dir=stub_test_env_template / "content"
         )
 
 
-def test_file_not_found(setup_test_env):
+def test_file_not_found(stub_test_env_template):
     # Create a path to a non-existent file
-    non_existent_file = Path(setup_test_env) / "quartz/static/non_existent.jpg"
+    non_existent_file = stub_test_env_template / "quartz/static/non_existent.jpg"
 
     # Ensure the file doesn't actually exist
     assert not non_existent_file.exists()
@@ -138,21 +134,21 @@ def test_file_not_found(setup_test_env):
         convert_assets.convert_asset(non_existent_file)
 
 
-def test_ignores_non_quartz_path(setup_test_env):
-    asset_path = Path(setup_test_env) / "file.png"
+def test_ignores_non_quartz_path(stub_test_env_template):
+    asset_path = stub_test_env_template / "file.png"
 
     with pytest.raises(ValueError, match="quartz.*directory"):
         convert_assets.convert_asset(
-            asset_path, md_replacement_dir=Path(setup_test_env) / "content"
+            asset_path, md_replacement_dir=stub_test_env_template / "content"
         )
 
 
-def test_ignores_non_static_path(setup_test_env):
-    asset_path = Path(setup_test_env) / "quartz" / "file.png"
+def test_ignores_non_static_path(stub_test_env_template):
+    asset_path = stub_test_env_template / "quartz" / "file.png"
 
     with pytest.raises(ValueError, match="static.*subdirectory"):
         convert_assets.convert_asset(
-            asset_path, md_replacement_dir=Path(setup_test_env) / "content"
+            asset_path, md_replacement_dir=stub_test_env_template / "content"
         )
 
 
@@ -254,24 +250,25 @@ import pytest
     """,
     ],
 )
-def test_video_figure_caption_formatting(setup_test_env, initial_content):
-    test_dir = Path(setup_test_env)
-    content_dir = test_dir / "content"
+def test_video_figure_caption_formatting(
+    stub_test_env, initial_content, monkeypatch, recorder
+):
+    content_dir = stub_test_env.content
 
     # Create a test markdown file with the pattern we want to change
     test_md = content_dir / "test_video_figure.md"
     test_md.write_text(initial_content)
 
-    # Create a dummy video file
-    dummy_video = test_dir / "quartz/static/test_video.mp4"
-    test_utils.create_test_video(dummy_video)
+    # Only the markdown rewrite is under test, so skip encoding the video
+    dummy_video = stub_test_env.static / "test_video.mp4"
+    dummy_video.write_bytes(test_utils.STUB_ASSET_BYTES[".mp4"])
+    monkeypatch.setattr(compress, "to_hevc_video", recorder)
 
     # Run the conversion
     convert_assets.convert_asset(dummy_video, md_replacement_dir=content_dir)
 
     # Read the content of the file after conversion
-    with open(test_md, "r") as f:
-        converted_content = f.read()
+    converted_content = test_md.read_text()
 
     # Check if the pattern has been correctly modified
     expected_pattern = r"</video>\n\nFigure: This is a caption"
@@ -1,3 +1,4 @@
+import contextlib
 import unittest.mock as mock
 import tempfile
 import pytest
@@ -9,10 +10,8 @@ from .. import convert_markdown_yaml
 
 try:
     from . import utils as test_utils
-    from .utils import setup_test_env
 except ImportError:
     import utils as test_utils  # type: ignore
-    from test_utils import setup_test_env  # type: ignore
 
 
 @pytest.fixture
@@ -25,8 +24,26 @@ def mock_git_root(tmp_path):
         yield git_root
 
 
-mock_r2_upload = mock.MagicMock()
-mock.patch.dict("sys.modules", {"r2_upload": mock_r2_upload}).start()
+# Patched for every card image test, in the order card_image_mocks yields them
+_CARD_IMAGE_PATCH_TARGETS: tuple[str, ...] = (
+    "requests.get",
+    "subprocess.run",
+    "shutil.move",
+    "scripts.convert_markdown_yaml.r2_upload.upload_and_move",
+)
+
+
+@pytest.fixture
+def card_image_mocks():
+    """Patches the download, conversion, move, and upload steps."""
+    with contextlib.ExitStack() as stack:
+        yield tuple(
+            stack.enter_context(mock.patch(target))
+            for target in _CARD_IMAGE_PATCH_TARGETS
+        )
+
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
 
 
 @pytest.mark.parametrize(
@@ -57,33 +74,29 @@ Content with non-AVIF card_image.
     ],
 )
 def test_process_card_image_in_markdown_skips_cases(
-    setup_test_env, mock_git_root, markdown_content
+    mock_git_root, card_image_mocks, markdown_content
 ):
     md_file = mock_git_root / "static" / "images" / "posts" / "test.md"
     md_file.write_text(markdown_content)
 
-    with mock.patch("requests.get") as mock_get, mock.patch(
-        "subprocess.run"
-    ) as mock_subproc_run, mock.patch("shutil.move") as mock_shutil_move, mock.patch(
-        "scripts.convert_markdown_yaml.r2_upload.upload_and_move"
-    ) as mock_r2_upload:
+    mock_get, mock_subproc_run, mock_shutil_move, mock_r2_upload = card_image_mocks
 
-        convert_markdown_yaml.process_card_image_in_markdown(md_file)
+    convert_markdown_yaml.process_card_image_in_markdown(md_file)
 
-        # Ensure that no download was attempted
-        mock_get.assert_not_called()
-        # Ensure that no subprocess was run
-        mock_subproc_run.assert_not_called()
-        # Ensure that no file was moved
-        mock_shutil_move.assert_not_called()
-        # Ensure that R2 upload was not called
-        mock_r2_upload.assert_not_called()
+    # Ensure that no download was attempted
+    mock_get.assert_not_called()
+    # Ensure that no subprocess was run
+    mock_subproc_run.assert_not_called()
+    # Ensure that no file was moved
+    mock_shutil_move.assert_not_called()
+    # Ensure that R2 upload was not called
+    mock_r2_upload.assert_not_called()
 
-        # Markdown file should remain unchanged
-        assert md_file.read_text() == markdown_content
+    # Markdown file should remain unchanged
+    assert md_file.read_text() == markdown_content
 
 
-def test_process_card_image_in_markdown_success(setup_test_env, mock_git_root):
+def test_process_card_image_in_markdown_success(mock_git_root, card_image_mocks):
     markdown_content = """---
 title: "Test Post"
 date: "2023-10-10"
@@ -104,13 +117,8 @@ Content with AVIF card_image.
         new_card_image_url = "http://r2.example.com/static/images/card_images/image.png"
         converted_png_path.touch()
 
-        with mock.patch("requests.get") as mock_get, mock.patch(
-            "subprocess.run"
-        ) as mock_subproc_run, mock.patch(
-            "shutil.move"
-        ) as mock_shutil_move, mock.patch(
-            "scripts.convert_markdown_yaml.r2_upload.upload_and_move"
-        ) as mock_r2_upload, mock.patch(
+        mock_get, mock_subproc_run, mock_shutil_move, mock_r2_upload = card_image_mocks
+        with mock.patch(
             "scripts.convert_markdown_yaml.r2_upload.R2_BASE_URL",
             "http://r2.example.com",
         ), mock.patch(
@@ -158,7 +166,9 @@ Content with AVIF card_image.
             assert md_file.read_text() == expected_updated_content
 
 
-def test_process_card_image_in_markdown_download_failure(setup_test_env, mock_git_root):
+def test_process_card_image_in_markdown_download_failure(
+    mock_git_root, card_image_mocks
+):
     markdown_content = """---
 title: "Test Post"
 date: "2023-10-10"
@@ -170,34 +180,30 @@ Content with AVIF card_image.
     md_file = mock_git_root / "static" / "images" / "posts" / "test.md"
     md_file.write_text(markdown_content)
 
-    with mock.patch("requests.get") as mock_get, mock.patch(
-        "subprocess.run"
-    ) as mock_subproc_run, mock.patch("shutil.move") as mock_shutil_move, mock.patch(
-        "scripts.convert_markdown_yaml.r2_upload.upload_and_move"
-    ) as mock_r2_upload:
+    mock_get, mock_subproc_run, mock_shutil_move, mock_r2_upload = card_image_mocks
 
-        # Mock the image download response to fail
-        mock_get.return_value.status_code = 404
+    # Mock the image download response to fail
+    mock_get.return_value.status_code = 404
 
-        with pytest.raises(ValueError, match="Failed to download image"):
-            convert_markdown_yaml.process_card_image_in_markdown(md_file)
+    with pytest.raises(ValueError, match="Failed to download image"):
+        convert_markdown_yaml.process_card_image_in_markdown(md_file)
 
-        # Verify that the image was attempted to be downloaded
-        mock_get.assert_called()
+    # Verify that the image was attempted to be downloaded
+    mock_get.assert_called()
 
-        # Ensure that no subprocess was run
-        mock_subproc_run.assert_not_called()
-        # Ensure that no file was moved
-        mock_shutil_move.assert_not_called()
-        # Ensure that R2 upload was not called
-        mock_r2_upload.assert_not_called()
+    # Ensure that no subprocess was run
+    mock_subproc_run.assert_not_called()
+    # Ensure that no file was moved
+    mock_shutil_move.assert_not_called()
+    # Ensure that R2 upload was not called
+    mock_r2_upload.assert_not_called()
 
-        # Markdown file should remain unchanged
-        assert md_file.read_text() == markdown_content
+    # Markdown file should remain unchanged
+    assert md_file.read_text() == markdown_content
 
 
 def test_process_card_image_in_markdown_conversion_failure(
-    setup_test_env, mock_git_root
+    mock_git_root, card_image_mocks
 ):
     markdown_content = """---
 title: "Test Post"
@@ -219,40 +225,36 @@ Content with AVIF card_image.
     downloaded_avif_path.parent.mkdir(parents=True, exist_ok=True)
     downloaded_avif_path.touch()
 
-    with mock.patch("requests.get") as mock_get, mock.patch(
-        "subprocess.run"
-    ) as mock_subproc_run, mock.patch("shutil.move") as mock_shutil_move, mock.patch(
-        "scripts.convert_markdown_yaml.r2_upload.upload_and_move"
-    ) as mock_r2_upload:
-
-        # Mock the image download response
-        mock_response = mock.Mock()
-        mock_response.status_code = 200
-        mock_response.raw = io.BytesIO(b"fake image data")
-        mock_get.return_value = mock_response
-
-        # Mock subprocess.run to raise an error during ImageMagick conversion
-        mock_subproc_run.side_effect = subprocess.CalledProcessError(
-            returncode=1, cmd=["magick"], stderr="ImageMagick conversion error."
-        )
+    mock_get, mock_subproc_run, mock_shutil_move, mock_r2_upload = card_image_mocks
 
-        with pytest.raises(subprocess.CalledProcessError, match="magick"):
-            convert_markdown_yaml.process_card_image_in_markdown(md_file)
+    # Mock the image download response
+    mock_response = mock.Mock()
+    mock_response.status_code = 200
+    mock_response.raw = io.BytesIO(b"fake image data")
+    mock_get.return_value = mock_response
+
+    # Mock subprocess.run to raise an error during ImageMagick conversion
+    mock_subproc_run.side_effect = subprocess.CalledProcessError(
+        returncode=1, cmd=["magick"], stderr="ImageMagick conversion error."
+    )
+
+    with pytest.raises(subprocess.CalledProcessError, match="magick"):
+        convert_markdown_yaml.process_card_image_in_markdown(md_file)
 
-        # Verify that the image was downloaded
-        mock_get.assert_called()
+    # Verify that the image was downloaded
+    mock_get.assert_called()
 
-        # Verify that ImageMagick was called
-        mock_subproc_run.assert_called()
+    # Verify that ImageMagick was called
+    mock_subproc_run.assert_called()
 
-        # Ensure that R2 upload was not called
-        mock_r2_upload.assert_not_called()
+    # Ensure that R2 upload was not called
+    mock_r2_upload.assert_not_called()
 
-        # Ensure that the PNG file was not created due to conversion failure
-        assert not converted_png_path.exists()
+    # Ensure that the PNG file was not created due to conversion failure
+    assert not converted_png_path.exists()
 
-        # Markdown file should remain unchanged
-        assert md_file.read_text() == markdown_content
+    # Markdown file should remain unchanged
+    assert md_file.read_text() == markdown_content
 
 
 def test_main(mock_git_root):
@@ -281,4 +283,6 @@ Content with AVIF card_image.
         ):
             convert_markdown_yaml.main()
 
-    mock_process.assert_called_once_with(md_file)
+    assert mock_process.call_count == 1
+    assert mock_process.call_args.args == (md_file,)
+    assert not mock_process.call_args.kwargs
@@ -0,0 +1,210 @@
+import asyncio
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from .. import create_html_descriptions
+
+
+class _FakeModel:
+    """Stands in for the Gemini model, returning queued responses in order."""
+
+    def __init__(self, *texts: str) -> None:
+        self.texts = list(texts)
+        self.prompts: list[str] = []
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        return MagicMock(text=self.texts.pop(0))
+
+
+@pytest.fixture
+def fake_gemini(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Points the description cache at a temporary database and returns a
+    function which installs a fake model with the given responses.
+    """
+    monkeypatch.setattr(
+        create_html_descriptions, "_CACHE_PATH", tmp_path / "cache.sqlite"
+    )
+    # Fresh limiters, so no tokens carry over between tests
+    for limiter in ("_request_limiter", "_token_limiter"):
+        monkeypatch.setattr(
+            create_html_descriptions,
+            limiter,
+            create_html_descriptions._TokenBucket(1_000_000),
+        )
+
+    def _install(*texts: str) -> _FakeModel:
+        model = _FakeModel(*texts)
+        monkeypatch.setattr(create_html_descriptions, "_get_model", lambda: model)
+        return model
+
+    return _install
+
+
+def test_cache_hit_skips_model(fake_gemini):
+    model = fake_gemini("A cached description.")
+
+    first = asyncio.run(create_html_descriptions.get_gemini_description("Post"))
+    second = asyncio.run(create_html_descriptions.get_gemini_description("Post"))
+
+    assert first == second == "A cached description."
+    assert model.prompts == [create_html_descriptions._PROMPT_PREFIX + "Post"]
+
+
+def test_cache_distinguishes_content(fake_gemini):
+    model = fake_gemini("First.", "Second.")
+
+    assert asyncio.run(create_html_descriptions.get_gemini_description("A")) == (
+        "First."
+    )
+    assert asyncio.run(create_html_descriptions.get_gemini_description("B")) == (
+        "Second."
+    )
+    assert len(model.prompts) == 2
+
+
+def test_no_cache_overwrites_entry(fake_gemini):
+    model = fake_gemini("Old description.", "New description.")
+
+    asyncio.run(create_html_descriptions.get_gemini_description("Post"))
+    regenerated = asyncio.run(
+        create_html_descriptions.get_gemini_description("Post", use_cache=False)
+    )
+    cached = asyncio.run(create_html_descriptions.get_gemini_description("Post"))
+
+    assert regenerated == cached == "New description."
+    assert len(model.prompts) == 2
+
+
+def test_cache_key_depends_on_generation_config(monkeypatch: pytest.MonkeyPatch):
+    key = create_html_descriptions._cache_key("prompt")
+    monkeypatch.setitem(create_html_descriptions._GENERATION_CONFIG, "temperature", 1)
+    assert create_html_descriptions._cache_key("prompt") != key
+
+
+@pytest.mark.parametrize(
+    "description, expected",
+    [
+        ("Short and sweet.", "Short and sweet."),
+        ("  Padded.\n", "Padded."),
+        ("x" * 160, "x" * 160),
+    ],
+)
+def test_truncate_description_keeps_fitting_text(description, expected):
+    assert create_html_descriptions._truncate_description(description) == expected
+
+
+def test_truncate_description_cuts_at_word_boundary():
+    description = " ".join(f"word{i}" for i in range(40))
+    truncated = create_html_descriptions._truncate_description(description)
+
+    assert len(truncated) <= create_html_descriptions._MAX_DESCRIPTION_LENGTH
+    assert description.startswith(truncated)
+    # The cut falls between words, never inside one
+    assert description[len(truncated)] == " "
+
+
+def test_read_front_matter_needs_description(tmp_path: Path):
+    post = tmp_path / "post.md"
+    post.write_text("---\ntitle: Post\n---\nBody text.\n")
+
+    assert create_html_descriptions._read_front_matter(post) == (
+        "---\ntitle: Post\n---\nBody text.\n",
+        {"title": "Post"},
+    )
+
+
+def test_read_front_matter_skips_described(tmp_path: Path):
+    post = tmp_path / "post.md"
+    post.write_text("---\ntitle: Post\ndescription: Done.\n---\nBody.\n")
+
+    assert create_html_descriptions._read_front_matter(post) is None
+
+
+def test_read_front_matter_skips_missing_front_matter(tmp_path: Path):
+    post = tmp_path / "post.md"
+    post.write_text("No front matter here.\n" * 1000)
+
+    assert create_html_descriptions._read_front_matter(post) is None
+
+
+def test_read_front_matter_past_peek(tmp_path: Path):
+    long_value = "a" * (2 * create_html_descriptions._FRONT_MATTER_PEEK_CHARS)
+    text = f"---\ntitle: Post\nsummary: {long_value}\n---\nBody.\n"
+    post = tmp_path / "post.md"
+    post.write_text(text)
+
+    content, data = create_html_descriptions._read_front_matter(post)
+
+    assert content == text
+    assert data == {"title": "Post", "summary": long_value}
+
+
+def test_read_front_matter_reads_long_body(tmp_path: Path):
+    body = "Body line.\n" * create_html_descriptions._FRONT_MATTER_PEEK_CHARS
+    text = f"---\ntitle: Post\n---\n{body}"
+    post = tmp_path / "post.md"
+    post.write_text(text)
+
+    content, _ = create_html_descriptions._read_front_matter(post)
+
+    assert content == text
+
+
+def test_token_bucket_refill_timing():
+    clock = {"now": 100.0}
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    async def run() -> None:
+        # Two tokens per second
+        bucket = create_html_descriptions._TokenBucket(
+            2, period=1.0, clock=lambda: clock["now"], sleep=fake_sleep
+        )
+        await bucket.acquire(2)
+        assert sleeps == []  # Starts full
+
+        await bucket.acquire()
+        assert sleeps == [pytest.approx(0.5)]
+
+        clock["now"] += 10  # Refilling stops at capacity
+        await bucket.acquire(2)
+        assert len(sleeps) == 1
+
+        # Requests larger than the bucket are clamped to its capacity
+        await bucket.acquire(5)
+        assert sleeps[1:] == [pytest.approx(1.0)]
+
+    asyncio.run(run())
+
+
+def test_process_files_survives_failed_generation(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys
+):
+    posts = [tmp_path / "good.md", tmp_path / "bad.md"]
+    for post in posts:
+        post.write_text(f"---\ntitle: {post.stem}\n---\n{post.stem} body\n")
+
+    async def fake_generate(content, semaphore, use_cache):
+        if "bad body" in content:
+            raise RuntimeError("Response was blocked")
+        return "A fine description."
+
+    reviewed: list[Path] = []
+
+    async def fake_process_file(file_path, content, data, generated_description):
+        reviewed.append(file_path)
+
+    monkeypatch.setattr(
+        create_html_descriptions, "_generate_description", fake_generate
+    )
+    monkeypatch.setattr(create_html_descriptions, "process_file", fake_process_file)
+
+    asyncio.run(create_html_descriptions.process_files(posts))
+
+    assert reviewed == [tmp_path / "good.md"]
+    assert "Response was blocked" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from .. import download_images
+
+
+def _find_urls(content: str) -> list[str]:
+    return [url for url, _ in download_images._ASSET_URL_PATTERN.findall(content)]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        # A single dot before the suffix; the pattern once required two
+        ("![](https://example.com/a.png)", ["https://example.com/a.png"]),
+        (
+            "![alt text](https://example.com/dir/b.jpeg)",
+            ["https://example.com/dir/b.jpeg"],
+        ),
+        (
+            '<img src="https://example.com/c.jpg" alt="c">',
+            ["https://example.com/c.jpg"],
+        ),
+        ("<video src='http://example.com/d.mp4'>", ["http://example.com/d.mp4"]),
+        # Adjacent links on one line are found separately
+        (
+            "![](https://example.com/1.png) ![](https://example.com/2.gif)",
+            ["https://example.com/1.png", "https://example.com/2.gif"],
+        ),
+        (
+            '<img src="https://example.com/1.webp"><img src="https://example.com/2.avif">',
+            ["https://example.com/1.webp", "https://example.com/2.avif"],
+        ),
+    ],
+)
+def test_asset_url_pattern_finds_links(content, expected):
+    assert _find_urls(content) == expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "[A page](https://example.com/page)",
+        "A local image: ![](static/images/a.png)",
+        # The suffix has to end the URL
+        "![](https://example.com/a.png/page)",
+    ],
+)
+def test_asset_url_pattern_ignores_non_assets(content):
+    assert _find_urls(content) == []
+
+
+def test_replace_urls_in_file_prefers_longest_url(tmp_path: Path):
+    content = "![](https://example.com/img.png.webp) ![](https://example.com/img.png)"
+    urls = _find_urls(content)
+    # The scan captures each URL whole, including one which another prefixes
+    assert urls == ["https://example.com/img.png.webp", "https://example.com/img.png"]
+
+    replacements = {url: f"/static/images/posts/{Path(url).name}" for url in urls}
+    markdown_file = tmp_path / "post.md"
+
+    download_images.replace_urls_in_file(
+        markdown_file,
+        content,
+        download_images._replacement_pattern(replacements),
+        replacements,
+    )
+
+    assert markdown_file.read_text() == (
+        "![](/static/images/posts/img.png.webp) ![](/static/images/posts/img.png)"
+    )
+
+
+def test_main_rewrites_downloaded_urls(tmp_path: Path):
+    markdown_file = tmp_path / "post.md"
+    markdown_file.write_text(
+        "![](https://example.com/ok.png) ![](https://example.com/fail.jpg)\n"
+    )
+
+    with patch.object(
+        download_images.script_utils, "get_git_root", return_value=tmp_path
+    ), patch.object(
+        download_images,
+        "download_image",
+        side_effect=lambda url, target_dir: "fail" not in url,
+    ) as mock_download:
+        download_images.main([markdown_file])
+
+    assert mock_download.call_count == 2
+    # Failed downloads keep their original URL
+    assert markdown_file.read_text() == (
+        "![](/static/images/posts/ok.png) ![](https://example.com/fail.jpg)\n"
+    )
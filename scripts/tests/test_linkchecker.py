@@ -1,42 +1,50 @@
+import shutil
 import subprocess
 from pathlib import Path
 import pytest
 
-from .. import utils as script_utils
 
+pytestmark = pytest.mark.skipif(
+    not shutil.which("fish") or not shutil.which("linkchecker"),
+    reason="fish or linkchecker is not installed",
+)
 
-@pytest.fixture(scope="session")
-def html_linkchecker_result():
-    git_root = script_utils.get_git_root()
-
-    result = subprocess.run(
-        [
-            "fish",
-            git_root / Path("scripts", "linkchecker.fish"),
-            Path(git_root, "scripts", "tests", ".linkchecker.test.html"),
-        ],
-        capture_output=True,
-        text=True,
+_GIT_ROOT = Path(__file__).resolve().parents[2]
+
+# Fail the fixture instead of hanging the session if a checker stalls
+_LINKCHECKER_TIMEOUT_SECONDS = 30
+
+
+def _run_linkchecker(script_name: str, target_name: str) -> subprocess.CompletedProcess:
+    """Runs a fish linkchecker script on a test file and returns the result."""
+    args = [
+        "fish",
+        str(_GIT_ROOT / "scripts" / script_name),
+        str(_GIT_ROOT / "scripts" / "tests" / target_name),
+    ]
+    process = subprocess.run(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=_LINKCHECKER_TIMEOUT_SECONDS,
         check=False,
     )
-    return result
+    return subprocess.CompletedProcess(
+        args,
+        process.returncode,
+        process.stdout.decode("utf-8", "replace"),
+        process.stderr.decode("utf-8", "replace"),
+    )
+
+
+@pytest.fixture(scope="session")
+def html_linkchecker_result():
+    return _run_linkchecker("linkchecker.fish", ".linkchecker.test.html")
 
 
 @pytest.fixture(scope="session")
 def md_linkchecker_result():
-    git_root = script_utils.get_git_root()
-
-    result = subprocess.run(
-        [
-            "fish",
-            git_root / Path("scripts", "md_linkchecker.fish"),
-            Path(git_root, "scripts", "tests", ".linkchecker.test.md"),
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    return result
+    return _run_linkchecker("md_linkchecker.fish", ".linkchecker.test.md")
 
 
 def test_invalid_port_error(html_linkchecker_result):
@@ -299,6 +299,15 @@ def test_main_upload_all_custom_filetypes(
         "--replacement-dir",
         str(content_dir),
     ]
+    uploaded_keys: list[str] = []
+
+    def read_files_from(command: list[str], **kwargs):
+        if "--files-from" in command:
+            files_from = command[command.index("--files-from") + 1]
+            uploaded_keys.extend(Path(files_from).read_text().split())
+        return mock_rclone.return_value
+
+    mock_rclone.side_effect = read_files_from
     with patch("sys.argv", arg_list):
         r2_upload.main()
 
@@ -306,33 +315,31 @@ def test_main_upload_all_custom_filetypes(
     for file in ("file4.png", "file5.jpg"):
         assert f"https://assets.turntrout.com/static/{file}" in md_content
 
-    # Check if rclone was called for both PNG and JPG files
-    assert any(
-        call[0][0]
-        == [
-            "rclone",
-            "copyto",
-            str(static_dir / "file4.png"),
-            f"r2:{r2_upload.R2_BUCKET_NAME}/static/file4.png",
-        ]
-        for call in mock_rclone.call_args_list
-    )
-    assert any(
-        call[0][0]
-        == [
-            "rclone",
-            "copyto",
-            str(static_dir / "file5.jpg"),
-            f"r2:{r2_upload.R2_BUCKET_NAME}/static/file5.jpg",
-        ]
-        for call in mock_rclone.call_args_list
-    )
+    # Both files should be uploaded by a single batched rclone call
+    rclone_commands = [
+        call[0][0] for call in mock_rclone.call_args_list if call[0][0][0] == "rclone"
+    ]
+    assert len(rclone_commands) == 1
+    assert rclone_commands[0][:2] == ["rclone", "copy"]
+    assert rclone_commands[0][-2:] == [
+        str(mock_git_root / "quartz"),
+        f"r2:{r2_upload.R2_BUCKET_NAME}/",
+    ]
+    assert sorted(uploaded_keys) == ["static/file4.png", "static/file5.jpg"]
 
-    # Count the number of 'copyto' calls
-    copyto_count = sum(
-        1 for call in mock_rclone.call_args_list if call[0][0][1] == "copyto"
-    )
-    assert copyto_count == 2, f"Expected 2 'copyto' calls, but got {copyto_count}"
+
+def test_upload_and_move_all_failure(mock_git_root: Path):
+    test_file = mock_git_root / "quartz" / "static" / "test_fail.jpg"
+    test_file.parent.mkdir(parents=True, exist_ok=True)
+    test_file.touch()
+
+    with patch(
+        "subprocess.run", side_effect=subprocess.CalledProcessError(1, "rclone")
+    ), patch("shutil.move") as mock_move:
+        with pytest.raises(RuntimeError):
+            r2_upload.upload_and_move_all([test_file])
+
+    mock_move.assert_not_called()
 
 
 def test_preserve_path_structure(mock_git_root: Path, tmp_path: Path):
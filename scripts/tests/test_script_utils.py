@@ -113,8 +113,8 @@ def test_get_files_gitignore(tmp_path):
     try:
         # Create a git repository
         repo = git.Repo.init(tmp_path)
-        with open(tmp_path / ".gitignore", "w", encoding="utf-8") as f:
-            f.write("*.txt\n")  # Ignore text files
+        # Ignore text files
+        (tmp_path / ".gitignore").write_text("*.txt\n", encoding="utf-8")
 
         md_file = tmp_path / "test.md"
         txt_file = tmp_path / "test.txt"
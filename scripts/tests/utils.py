@@ -1,5 +1,7 @@
 from pathlib import Path
+import shutil
 import subprocess
+from types import SimpleNamespace
 from .. import compress
 from typing import Optional
 import pytest
@@ -80,41 +82,116 @@ def create_test_gif(file_path, duration=1, size=(100, 100), fps=10):
     )
 
 
-@pytest.fixture
-def setup_test_env(tmp_path):
-    """Sets up a temporary Git repository and populates it with test assets."""
+# Just enough of each format's header to identify the file type. Tests which
+# never decode their assets can use these instead of ImageMagick and FFmpeg.
+STUB_ASSET_BYTES: dict[str, bytes] = {
+    ".jpg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+    ".jpeg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+    ".png": b"\x89PNG\r\n\x1a\n",
+    ".gif": b"GIF89a",
+    ".mov": b"\x00\x00\x00\x14ftypqt  ",
+    ".mp4": b"\x00\x00\x00\x18ftypmp42",
+    ".webm": b"\x1a\x45\xdf\xa3",
+    ".avi": b"RIFF\x00\x00\x00\x00AVI ",
+    ".mpeg": b"\x00\x00\x01\xba",
+}
+
+
+def populate_test_env(root: Path, stub_assets: bool = False) -> None:
+    """
+    Populates a directory with test assets and markdown files referencing them.
+
+    Args:
+        root (Path): The directory to populate.
+        stub_assets (bool): Whether to write placeholder headers from
+            STUB_ASSET_BYTES instead of real, decodable media.
+    """
 
     # Create the required directories for testing
     for dir_name in ["quartz/static", "scripts", "content"]:
-        (tmp_path / dir_name).mkdir(parents=True, exist_ok=True)
+        (root / dir_name).mkdir(parents=True, exist_ok=True)
+
+    # Markdown lines referencing each asset, keyed by extension. Each file is
+    # written in one go once all of its lines are known.
+    markdown_lines: dict[str, list[str]] = {}
 
     # Create image assets for testing and add reference to markdown file
     for ext in compress.ALLOWED_IMAGE_EXTENSIONS:
-        create_test_image(tmp_path / "quartz/static" / f"asset{ext}", "32x32")
-
-        to_write = f"![](static/asset{ext})\n"
-        to_write += f"[[static/asset{ext}]]\n"
-        to_write += f'<img src="static/asset{ext}" alt="shrek"/>\n'
-        markdown_file = tmp_path / "content" / f"{ext.lstrip('.')}.md"
-        markdown_file.write_text(to_write)
+        asset_path = root / "quartz/static" / f"asset{ext}"
+        if stub_assets:
+            asset_path.write_bytes(STUB_ASSET_BYTES[ext])
+        else:
+            create_test_image(asset_path, "32x32")
+
+        markdown_lines[ext] = [
+            f"![](static/asset{ext})",
+            f"[[static/asset{ext}]]",
+            f'<img src="static/asset{ext}" alt="shrek"/>',
+        ]
 
     # Create video assets for testing and add references to markdown files
     for ext in compress.ALLOWED_VIDEO_EXTENSIONS:
-        create_test_video(tmp_path / "quartz/static" / f"asset{ext}")
-        with open(tmp_path / "content" / f"{ext.lstrip('.')}.md", "a") as file:
-            file.write(f"![](static/asset{ext})\n")
-            file.write(f"[[static/asset{ext}]]\n")
-            if ext != ".gif":
-                file.write(f'<video src="static/asset{ext}" alt="shrek"/>\n')
+        asset_path = root / "quartz/static" / f"asset{ext}"
+        if stub_assets:
+            asset_path.write_bytes(STUB_ASSET_BYTES[ext])
+        else:
+            create_test_video(asset_path)
+
+        markdown_lines[ext] = [f"![](static/asset{ext})", f"[[static/asset{ext}]]"]
+        if ext != ".gif":
+            markdown_lines[ext].append(f'<video src="static/asset{ext}" alt="shrek"/>')
 
     # Special handling for GIF file in markdown
-    with open(tmp_path / "content" / "gif.md", "a") as file:
-        file.write('<img src="static/asset.gif" alt="shrek">')
+    markdown_lines[".gif"].append('<img src="static/asset.gif" alt="shrek">')
+
+    for ext, lines in markdown_lines.items():
+        markdown_file = root / "content" / f"{ext.lstrip('.')}.md"
+        markdown_file.write_text("\n".join(lines) + "\n")
 
     # Create an unsupported file
-    (tmp_path / "quartz/static/unsupported.txt").touch()
+    (root / "quartz/static/unsupported.txt").touch()
     # Create file outside of quartz/static
-    (tmp_path / "file.png").touch()
-    (tmp_path / "quartz" / "file.png").touch()
+    (root / "file.png").touch()
+    (root / "quartz" / "file.png").touch()
+
 
-    yield tmp_path  # Return the temporary directory path
+def env_paths(root: Path) -> SimpleNamespace:
+    """
+    Returns the commonly used paths of a test environment made by
+    populate_test_env.
+
+    Args:
+        root (Path): The environment's root directory.
+
+    Returns:
+        SimpleNamespace: root, static, and content directories, plus
+        asset(ext) and md(ext) for the asset and markdown file of an extension.
+    """
+    static_dir = root / "quartz" / "static"
+    content_dir = root / "content"
+    return SimpleNamespace(
+        root=root,
+        static=static_dir,
+        content=content_dir,
+        asset=lambda ext: static_dir / f"asset{ext}",
+        md=lambda ext: content_dir / f"{ext.lstrip('.')}.md",
+    )
+
+
+@pytest.fixture
+def setup_test_env(test_env_template: Path, tmp_path: Path):
+    """
+    Copies the session's test environment into a fresh temporary directory,
+    so tests can modify it freely. Yields the copy's paths from env_paths.
+    """
+    shutil.copytree(test_env_template, tmp_path, dirs_exist_ok=True)
+    yield env_paths(tmp_path)
+
+
+@pytest.fixture
+def stub_test_env(stub_test_env_template: Path, tmp_path: Path):
+    """
+    Like setup_test_env, but the assets are stubs which can't be decoded.
+    """
+    shutil.copytree(stub_test_env_template, tmp_path, dirs_exist_ok=True)
+    yield env_paths(tmp_path)